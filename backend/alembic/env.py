@@ -23,7 +23,8 @@ load_dotenv()
 config = context.config
 
 # Override the sqlalchemy.url with the DATABASE_URL from environment
-config.set_main_option('sqlalchemy.url', os.getenv('DATABASE_URL'))
+# (% is escaped for configparser; URL-encoded passwords and options contain it)
+config.set_main_option('sqlalchemy.url', os.getenv('DATABASE_URL').replace('%', '%%'))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,71 @@
+"""initial schema
+
+Revision ID: 0b7e4f1c9a35
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e4f1c9a35'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The schema models.Base.metadata.create_all built before migrations existed
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=True)
+    op.create_table(
+        'notes',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('vector_id', sa.String(), nullable=True),
+        sa.Column('owner_id', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notes_title', 'notes', ['title'], unique=False)
+    op.create_table(
+        'note_tags',
+        sa.Column('note_id', sa.String(), nullable=True),
+        sa.Column('tag_id', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['note_id'], ['notes.id']),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'])
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('note_tags')
+    op.drop_index('ix_notes_title', table_name='notes')
+    op.drop_table('notes')
+    op.drop_index('ix_tags_name', table_name='tags')
+    op.drop_table('tags')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,26 @@
+"""add change versions for etags
+
+Revision ID: 3f9c2a7d1b04
+Revises: 0b7e4f1c9a35
+Create Date: 2026-10-19 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b04'
+down_revision = '0b7e4f1c9a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('change_version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('notes', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('notes', 'version')
+    op.drop_column('users', 'change_version')
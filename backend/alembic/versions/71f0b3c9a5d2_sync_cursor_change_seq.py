@@ -0,0 +1,37 @@
+"""use per-user change sequence as the delta-sync cursor
+
+Revision ID: 71f0b3c9a5d2
+Revises: e28a1d94f6c3
+Create Date: 2026-10-20 10:15:00.000000
+
+Existing rows get change_seq 0, and cursors are now integers rather than
+timestamps, so clients must run one full sync (no since) after upgrading.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71f0b3c9a5d2'
+down_revision = 'e28a1d94f6c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('notes', sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.drop_index('ix_notes_owner_id_updated_at', table_name='notes')
+    op.create_index('ix_notes_owner_id_change_seq', 'notes', ['owner_id', 'change_seq'])
+    op.add_column('note_tombstones', sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.drop_index('ix_note_tombstones_owner_id_deleted_at', table_name='note_tombstones')
+    op.create_index('ix_note_tombstones_owner_id_change_seq', 'note_tombstones', ['owner_id', 'change_seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_note_tombstones_owner_id_change_seq', table_name='note_tombstones')
+    op.create_index('ix_note_tombstones_owner_id_deleted_at', 'note_tombstones', ['owner_id', 'deleted_at'])
+    op.drop_column('note_tombstones', 'change_seq')
+    op.drop_index('ix_notes_owner_id_change_seq', table_name='notes')
+    op.create_index('ix_notes_owner_id_updated_at', 'notes', ['owner_id', 'updated_at'])
+    op.drop_column('notes', 'change_seq')
@@ -0,0 +1,35 @@
+"""add note tombstones and updated_at index for delta sync
+
+Revision ID: 8b41e6c0d2a9
+Revises: 3f9c2a7d1b04
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e6c0d2a9'
+down_revision = '3f9c2a7d1b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Notes created before updated_at was set on insert still have NULLs
+    op.execute("UPDATE notes SET updated_at = created_at WHERE updated_at IS NULL")
+    op.create_index('ix_notes_owner_id_updated_at', 'notes', ['owner_id', 'updated_at'])
+    op.create_table(
+        'note_tombstones',
+        sa.Column('note_id', sa.String(), primary_key=True),
+        sa.Column('owner_id', sa.String(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_note_tombstones_owner_id_deleted_at', 'note_tombstones', ['owner_id', 'deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_note_tombstones_owner_id_deleted_at', table_name='note_tombstones')
+    op.drop_table('note_tombstones')
+    op.drop_index('ix_notes_owner_id_updated_at', table_name='notes')
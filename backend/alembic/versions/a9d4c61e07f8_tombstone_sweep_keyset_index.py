@@ -0,0 +1,27 @@
+"""index tombstones for the reconciler's keyset sweep
+
+Revision ID: a9d4c61e07f8
+Revises: 71f0b3c9a5d2
+Create Date: 2026-10-20 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4c61e07f8'
+down_revision = '71f0b3c9a5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_note_tombstones_deleted_at_note_id', 'note_tombstones', ['deleted_at', 'note_id'])
+    # Checkpoints written before the keyset included note_id are not resumable
+    op.execute("DELETE FROM sync_checkpoints WHERE name = 'reconcile:tombstones'")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_note_tombstones_deleted_at_note_id', table_name='note_tombstones')
+    op.execute("DELETE FROM sync_checkpoints WHERE name = 'reconcile:tombstones'")
@@ -0,0 +1,50 @@
+"""index notes by owner and give note_tags a primary key
+
+Revision ID: c5d72f183e6b
+Revises: 8b41e6c0d2a9
+Create Date: 2026-10-19 13:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d72f183e6b'
+down_revision = '8b41e6c0d2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_notes_owner_id_created_at_id', 'notes', ['owner_id', 'created_at', 'id'])
+
+    # Rebuild note_tags rather than altering it in place: SQLite cannot add a
+    # primary key or change foreign keys on an existing table, and copying
+    # with DISTINCT drops any duplicate links the missing key allowed
+    op.create_table(
+        'note_tags_new',
+        sa.Column('note_id', sa.String(), sa.ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('tag_id', sa.String(), sa.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    )
+    op.execute(
+        "INSERT INTO note_tags_new (note_id, tag_id) "
+        "SELECT DISTINCT note_id, tag_id FROM note_tags "
+        "WHERE note_id IS NOT NULL AND tag_id IS NOT NULL"
+    )
+    op.drop_table('note_tags')
+    op.rename_table('note_tags_new', 'note_tags')
+    op.create_index('ix_note_tags_tag_id_note_id', 'note_tags', ['tag_id', 'note_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_note_tags_tag_id_note_id', table_name='note_tags')
+    op.create_table(
+        'note_tags_old',
+        sa.Column('note_id', sa.String(), sa.ForeignKey('notes.id')),
+        sa.Column('tag_id', sa.String(), sa.ForeignKey('tags.id')),
+    )
+    op.execute("INSERT INTO note_tags_old (note_id, tag_id) SELECT note_id, tag_id FROM note_tags")
+    op.drop_table('note_tags')
+    op.rename_table('note_tags_old', 'note_tags')
+    op.drop_index('ix_notes_owner_id_created_at_id', table_name='notes')
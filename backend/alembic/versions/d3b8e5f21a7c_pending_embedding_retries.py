@@ -0,0 +1,28 @@
+"""add retry backoff to the pending embeddings queue
+
+Revision ID: d3b8e5f21a7c
+Revises: a9d4c61e07f8
+Create Date: 2026-10-20 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8e5f21a7c'
+down_revision = 'a9d4c61e07f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('pending_embeddings', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('pending_embeddings', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()))
+    op.create_index('ix_pending_embeddings_next_attempt_at', 'pending_embeddings', ['next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_embeddings_next_attempt_at', table_name='pending_embeddings')
+    op.drop_column('pending_embeddings', 'next_attempt_at')
+    op.drop_column('pending_embeddings', 'attempts')
@@ -0,0 +1,35 @@
+"""add pending embeddings queue and sync checkpoints
+
+Revision ID: e28a1d94f6c3
+Revises: c5d72f183e6b
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e28a1d94f6c3'
+down_revision = 'c5d72f183e6b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pending_embeddings',
+        sa.Column('note_id', sa.String(), sa.ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('enqueued_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        'sync_checkpoints',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('value', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_checkpoints')
+    op.drop_table('pending_embeddings')
@@ -0,0 +1,12 @@
+
+from fastapi import APIRouter, Depends
+
+from .. import models, auth
+from ..database import get_pool_stats
+
+router = APIRouter()
+
+# Pool internals are not for anonymous callers, unlike the plain /health check
+@router.get("/health/db")
+def database_health(current_user: models.User = Depends(auth.get_current_active_user)):
+    return get_pool_stats()
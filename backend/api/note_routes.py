@@ -1,13 +1,14 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import uuid
 
 from .. import models, schemas, auth
-from ..database import get_db
-from ..utils.vector_utils import get_embedding, get_combined_text
-from ..utils.db_utils import get_or_create_tags
+from ..database import get_db, get_read_db
+from ..utils.vector_utils import get_embedding, get_combined_text, build_vector_metadata
+from ..utils.db_utils import get_or_create_tags, get_change_version, bump_change_version, enqueue_embedding
+from ..utils.http_utils import make_etag, note_etag, etag_matches
 
 # Global index variable to be set in the main app
 index = None
@@ -15,56 +16,49 @@ index = None
 router = APIRouter()
 
 @router.post("/notes", response_model=schemas.NoteResponse)
-async def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_user)):
-    # Create note
-    vector_id = None
+async def create_note(note: schemas.NoteCreate, response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_user)):
+    # Create note in database
+    db_note = models.Note(
+        id=str(uuid.uuid4()),
+        title=note.title,
+        content=note.content,
+        type=note.type,
+        created_at=models.utcnow(),
+        owner_id=current_user.id
+    )
     
     # Get or create tags
     tags = get_or_create_tags(db, note.tags)
+    tag_names = [tag.name for tag in tags]
+    db_note.tags = tags
+    if note.storeVector:
+        db_note.vector_id = f"note:{db_note.id}"
+    
+    # Save to database before touching the index, so a failed save can
+    # never leave a vector behind that no note refers to
+    db.add(db_note)
+    db_note.change_seq = bump_change_version(db, current_user.id)
+    db.commit()
     
     # Store vector embedding if requested
     if note.storeVector:
         try:
             # Get embedding
-            combined_text = get_combined_text(note, [tag.name for tag in tags])
+            combined_text = get_combined_text(note, tag_names)
             embedding = get_embedding(combined_text)
             
-            # Generate unique ID for the note
-            note_id = str(uuid.uuid4())
-            vector_id = f"note:{note_id}"
-            
             # Store in Pinecone
-            index.upsert(vectors=[(vector_id, embedding, {
-                "id": note_id,
-                "title": note.title,
-                "type": note.type,
-                "user_id": current_user.id
-            })])
+            index.upsert(vectors=[(db_note.vector_id, embedding, build_vector_metadata(db_note, tag_names, current_user.id))])
         except Exception as e:
             print(f"Error creating vector: {str(e)}")
-            # Continue without vector storage if it fails
-    else:
-        note_id = str(uuid.uuid4())
-    
-    # Create note in database
-    db_note = models.Note(
-        id=note_id,
-        title=note.title,
-        content=note.content,
-        type=note.type,
-        vector_id=vector_id,
-        owner_id=current_user.id
-    )
-    
-    # Add tags to note
-    db_note.tags = tags
+            # Keep the note and let the reconciler retry the embedding
+            enqueue_embedding(db, db_note.id)
+            db.commit()
     
-    # Save to database
-    db.add(db_note)
-    db.commit()
     db.refresh(db_note)
     
     # Format response
+    response.headers["ETag"] = note_etag(db_note)
     return schemas.NoteResponse(
         id=db_note.id,
         title=db_note.title,
@@ -76,8 +70,21 @@ async def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db), c
     )
 
 @router.get("/notes", response_model=List[schemas.NoteResponse])
-async def get_all_notes(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_user)):
-    notes = db.query(models.Note).filter(models.Note.owner_id == current_user.id).all()
+async def get_all_notes(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_read_user)
+):
+    # Short-circuit before loading any notes if the client copy is current
+    etag = make_etag("notes", current_user.id, get_change_version(db, current_user.id))
+    if etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    notes = db.query(models.Note).filter(models.Note.owner_id == current_user.id).order_by(
+        models.Note.created_at.desc(), models.Note.id.desc()
+    ).all()
     
     # Format response
     response_notes = []
@@ -94,12 +101,65 @@ async def get_all_notes(db: Session = Depends(get_db), current_user: models.User
     
     return response_notes
 
+@router.get("/notes/changes", response_model=schemas.NoteChanges)
+async def get_note_changes(
+    since: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_read_user)
+):
+    """Return notes created or updated after the cursor, plus ids of deleted notes"""
+    # Versions are handed out in commit order, so every change up to the
+    # version read here is already visible; later ones wait for the next sync
+    cursor = get_change_version(db, current_user.id)
+    
+    notes_query = db.query(models.Note).filter(
+        models.Note.owner_id == current_user.id,
+        models.Note.change_seq <= cursor
+    )
+    tombstones = []
+    if since is not None:
+        notes_query = notes_query.filter(models.Note.change_seq > since)
+        tombstones = db.query(models.NoteTombstone).filter(
+            models.NoteTombstone.owner_id == current_user.id,
+            models.NoteTombstone.change_seq > since,
+            models.NoteTombstone.change_seq <= cursor
+        ).order_by(models.NoteTombstone.change_seq).all()
+    # Without a cursor this is a full sync, so there is nothing to tombstone
+    notes = notes_query.order_by(models.Note.change_seq).all()
+    
+    return schemas.NoteChanges(
+        notes=[schemas.NoteResponse(
+            id=note.id,
+            title=note.title,
+            content=note.content,
+            type=note.type,
+            date=note.created_at,
+            tags=[schemas.Tag(id=tag.id, name=tag.name) for tag in note.tags],
+            vectorId=note.vector_id
+        ) for note in notes],
+        deleted=[tombstone.note_id for tombstone in tombstones],
+        cursor=cursor
+    )
+
+# Reads from the primary: a lagging replica would hand out ETags that then
+# fail If-Match on update
 @router.get("/notes/{note_id}", response_model=schemas.NoteResponse)
-async def get_note(note_id: str, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_user)):
+async def get_note(
+    note_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
     note = db.query(models.Note).filter(models.Note.id == note_id, models.Note.owner_id == current_user.id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
+    etag = note_etag(note)
+    if etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     return schemas.NoteResponse(
         id=note.id,
         title=note.title,
@@ -114,6 +174,8 @@ async def get_note(note_id: str, db: Session = Depends(get_db), current_user: mo
 async def update_note(
     note_id: str, 
     note_update: schemas.NoteUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
@@ -122,6 +184,10 @@ async def update_note(
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
+    # Optimistic concurrency: reject the update if the client edited a stale copy
+    if if_match is not None and not etag_matches(if_match, note_etag(note)):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Note has been modified")
+    
     # Update fields if provided
     if note_update.title is not None:
         note.title = note_update.title
@@ -135,6 +201,18 @@ async def update_note(
         tags = get_or_create_tags(db, note_update.tags)
         note.tags = tags
     
+    # Guard against a concurrent write since the note was read. This runs
+    # before the index is touched, so a losing request never reaches Pinecone
+    bumped = db.query(models.Note).filter(
+        models.Note.id == note.id,
+        models.Note.version == note.version
+    ).update({models.Note.version: models.Note.version + 1}, synchronize_session=False)
+    if not bumped:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Note has been modified")
+    note.change_seq = bump_change_version(db, current_user.id)
+    db.flush()
+    
     # Update vector embedding if it exists
     if note.vector_id:
         try:
@@ -151,20 +229,19 @@ async def update_note(
             embedding = get_embedding(combined_text)
             
             # Update in Pinecone
-            index.upsert(vectors=[(note.vector_id, embedding, {
-                "id": note.id,
-                "title": note.title,
-                "type": note.type,
-                "user_id": current_user.id
-            })])
+            index.upsert(vectors=[(note.vector_id, embedding, build_vector_metadata(
+                note, [tag.name for tag in note.tags], current_user.id
+            ))])
         except Exception as e:
             print(f"Error updating vector: {str(e)}")
+            enqueue_embedding(db, note.id)
     
     # Save to database
     db.commit()
     db.refresh(note)
     
     # Format response
+    response.headers["ETag"] = note_etag(note)
     return schemas.NoteResponse(
         id=note.id,
         title=note.title,
@@ -187,10 +264,16 @@ async def delete_note(note_id: str, db: Session = Depends(get_db), current_user:
         try:
             index.delete(ids=[note.vector_id])
         except Exception as e:
+            # The tombstone written below lets the reconciler remove the orphan
             print(f"Error deleting vector: {str(e)}")
     
-    # Delete note from database
+    # Delete note from database, leaving a tombstone for delta sync
     db.delete(note)
+    db.merge(models.NoteTombstone(
+        note_id=note.id,
+        owner_id=current_user.id,
+        change_seq=bump_change_version(db, current_user.id)
+    ))
     db.commit()
     
     return None
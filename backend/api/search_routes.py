@@ -5,7 +5,7 @@ from typing import List
 
 from .. import models, schemas, auth
 from ..database import get_db
-from ..utils.vector_utils import get_embedding
+from ..utils.vector_utils import get_embedding, build_search_filter
 
 # Global index variable to be set in the main app
 index = None
@@ -18,16 +18,17 @@ async def search_notes(request: schemas.SearchRequest, db: Session = Depends(get
         # Get embedding for search query
         query_embedding = get_embedding(request.query)
         
-        # Search in Pinecone
+        # Search in Pinecone, pushing every constraint into the index so
+        # top_k is exact for the filtered set
         search_results = index.query(
             vector=query_embedding,
             top_k=request.limit,
             include_metadata=True,
-            filter={"user_id": current_user.id}
+            filter=build_search_filter(current_user.id, request)
         )
         
-        # Extract note IDs from results
-        note_ids = [match.id for match in search_results.matches]
+        # Extract note IDs from results; vector ids are prefixed with "note:"
+        note_ids = [(match.metadata or {}).get("id") or match.id.split(":", 1)[-1] for match in search_results.matches]
         
         # Get full notes from database
         notes = db.query(models.Note).filter(
@@ -35,6 +36,10 @@ async def search_notes(request: schemas.SearchRequest, db: Session = Depends(get
             models.Note.owner_id == current_user.id
         ).all()
         
+        # Keep the similarity ranking from the index
+        notes_by_id = {note.id: note for note in notes}
+        notes = [notes_by_id[note_id] for note_id in note_ids if note_id in notes_by_id]
+        
         # Format response
         response_notes = []
         for note in notes:
@@ -1,20 +1,31 @@
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import models, schemas, auth
-from ..database import get_db
+from ..database import get_read_db
+from ..utils.db_utils import get_change_version
+from ..utils.http_utils import make_etag, etag_matches
 
 router = APIRouter()
 
 @router.get("/tags", response_model=List[schemas.Tag])
-async def get_all_tags(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_user)):
-    # Get all tags that are associated with the user's notes
-    user_notes = db.query(models.Note).filter(models.Note.owner_id == current_user.id).all()
-    tags = set()
-    for note in user_notes:
-        for tag in note.tags:
-            tags.add(tag)
+async def get_all_tags(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_read_user)
+):
+    # Short-circuit before loading any notes if the client copy is current
+    etag = make_etag("tags", current_user.id, get_change_version(db, current_user.id))
+    if etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    # Get all tags that are associated with the user's notes in a single join
+    tags = db.query(models.Tag).join(models.Tag.notes).filter(
+        models.Note.owner_id == current_user.id
+    ).distinct().all()
     
     return [schemas.Tag(id=tag.id, name=tag.name) for tag in tags]
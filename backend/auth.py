@@ -7,7 +7,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from .database import get_db
+from .database import get_db, get_read_db
 from .models import User
 import os
 from dotenv import load_dotenv
@@ -70,8 +70,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# Current user dependency
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Current user lookup shared by the primary and read-replica dependencies
+def _get_user_from_token(token: str, db: Session):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -90,8 +90,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     return user
 
+# Current user dependency
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return _get_user_from_token(token, db)
+
+# Current user dependency for read-only routes; shares the route's replica
+# session so the request holds a single connection
+async def get_current_read_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    return _get_user_from_token(token, db)
+
 # Verify active user
 async def get_current_active_user(current_user = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+# Verify active user on read-only routes
+async def get_current_active_read_user(current_user = Depends(get_current_read_user)):
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
@@ -1,20 +1,145 @@
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+# Optional read replica; GET routes read from it when set
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# Pool settings (ignored by SQLite in-memory databases)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Postgres statement timeout in milliseconds, 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+
+# SQLite settings
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer, and busy_timeout makes
+    # writers wait for the lock instead of failing with "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def create_db_engine(url: str):
+    """Create an engine tuned for the backend named in the URL"""
+    if url.startswith("sqlite"):
+        pool_args = {}
+        # In-memory databases get a single-connection pool that takes no sizing
+        if make_url(url).database not in (None, "", ":memory:"):
+            pool_args = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+        engine = create_engine(
+            url,
+            # Sessions are handed between FastAPI's threadpool workers
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_pre_ping=DB_POOL_PRE_PING,
+            **pool_args
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+engine = create_db_engine(DATABASE_URL)
+read_engine = create_db_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Connection checkout metrics per engine, exported by the /health/db route
+pool_metrics = {
+    "primary": {"checkouts": 0, "timeouts": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0},
+    "replica": {"checkouts": 0, "timeouts": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0},
+}
+# Sessions are opened from FastAPI's threadpool, so updates must not interleave
+_metrics_lock = threading.Lock()
+
+def _open_session(session_factory, name: str):
+    """Open a session and check out its connection up front to time the pool wait"""
+    db = session_factory()
+    metrics = pool_metrics[name]
+    start = time.perf_counter()
+    try:
+        db.connection()
+    except PoolTimeoutError:
+        with _metrics_lock:
+            metrics["timeouts"] += 1
+        db.close()
+        raise
+    wait_ms = (time.perf_counter() - start) * 1000
+    with _metrics_lock:
+        metrics["checkouts"] += 1
+        metrics["wait_total_ms"] += wait_ms
+        metrics["wait_max_ms"] = max(metrics["wait_max_ms"], wait_ms)
+    return db
+
+def _pool_stats(engine, name: str):
+    pool = engine.pool
+    with _metrics_lock:
+        metrics = dict(pool_metrics[name])
+    stats = {
+        "pool": pool.status(),
+        "checkouts": metrics["checkouts"],
+        "timeouts": metrics["timeouts"],
+        "wait_avg_ms": metrics["wait_total_ms"] / metrics["checkouts"] if metrics["checkouts"] else 0.0,
+        "wait_max_ms": metrics["wait_max_ms"],
+    }
+    # Only queue-based pools with bounded overflow have a capacity to saturate;
+    # create_db_engine builds every one of them from the configured sizes
+    if isinstance(pool, QueuePool) and DB_MAX_OVERFLOW >= 0:
+        capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+        stats["checked_out"] = pool.checkedout()
+        stats["capacity"] = capacity
+        stats["saturation"] = pool.checkedout() / capacity if capacity else 0.0
+    return stats
+
+def get_pool_stats():
+    """Pool saturation and checkout wait-time metrics for the primary and replica"""
+    stats = {"primary": _pool_stats(engine, "primary")}
+    if read_engine is not engine:
+        stats["replica"] = _pool_stats(read_engine, "replica")
+    return stats
 
 # Dependency
 def get_db():
-    db = SessionLocal()
+    db = _open_session(SessionLocal, "primary")
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency for read-only routes; falls back to the primary without a replica
+def get_read_db():
+    db = _open_session(ReadSessionLocal, "replica" if read_engine is not engine else "primary")
     try:
         yield db
     finally:
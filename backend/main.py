@@ -6,16 +6,14 @@ import os
 import openai
 
 # Import local modules
-from .database import engine, get_db
-from . import models
+from .database import get_db
 from .utils.vector_utils import initialize_vector_db
-from .api import auth_routes, note_routes, search_routes, tag_routes
+from .api import auth_routes, health_routes, note_routes, search_routes, tag_routes
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Database tables are managed by Alembic: run `alembic upgrade head` before starting
 
 # Initialize FastAPI app
 app = FastAPI(title="ThoughtVault API")
@@ -33,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Initialize OpenAI
@@ -50,6 +49,7 @@ app.include_router(auth_routes.router, tags=["authentication"])
 app.include_router(note_routes.router, tags=["notes"])
 app.include_router(search_routes.router, tags=["search"])
 app.include_router(tag_routes.router, tags=["tags"])
+app.include_router(health_routes.router, tags=["health"])
 
 # Basic routes
 @app.get("/")
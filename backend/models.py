@@ -1,19 +1,26 @@
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Table, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Table, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from typing import List
 import uuid
 
 Base = declarative_base()
 
+def utcnow():
+    # Python-side timestamps keep sub-second precision on every backend
+    return datetime.now(timezone.utc)
+
 # Association table for note tags
 note_tags = Table(
     'note_tags',
     Base.metadata,
-    Column('note_id', String, ForeignKey('notes.id')),
-    Column('tag_id', String, ForeignKey('tags.id'))
+    Column('note_id', String, ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True),
+    Column('tag_id', String, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key covers note -> tags; this covers tag -> notes joins
+    Index('ix_note_tags_tag_id_note_id', 'tag_id', 'note_id')
 )
 
 class User(Base):
@@ -25,6 +32,8 @@ class User(Base):
     hashed_password = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
+    # Bumped on every note or tag write; used to build collection ETags
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     notes = relationship("Note", back_populates="owner")
@@ -40,17 +49,45 @@ class Note(Base):
     content = Column(Text)
     type = Column(String)  # note, link, image
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
     vector_id = Column(String, nullable=True)
+    # Incremented on every update; used to build per-note ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Owner's change_version at the note's last write; the delta-sync cursor
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
     owner_id = Column(String, ForeignKey("users.id"))
     
     # Relationships
     owner = relationship("User", back_populates="notes")
     tags = relationship("Tag", secondary=note_tags, back_populates="notes")
     
+    __table_args__ = (
+        # Every note query filters on owner; created_at and id serve ordered listings
+        Index("ix_notes_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_notes_owner_id_change_seq", "owner_id", "change_seq"),
+    )
+    
     def __repr__(self):
         return f"<Note {self.title}>"
 
+class NoteTombstone(Base):
+    __tablename__ = "note_tombstones"
+    
+    note_id = Column(String, primary_key=True)
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    # Owner's change_version at deletion; the delta-sync cursor
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    __table_args__ = (
+        Index("ix_note_tombstones_owner_id_change_seq", "owner_id", "change_seq"),
+        # Keyset order for the reconciler's tombstone sweep
+        Index("ix_note_tombstones_deleted_at_note_id", "deleted_at", "note_id"),
+    )
+    
+    def __repr__(self):
+        return f"<NoteTombstone {self.note_id}>"
+
 class Tag(Base):
     __tablename__ = "tags"
     
@@ -62,3 +99,30 @@ class Tag(Base):
     
     def __repr__(self):
         return f"<Tag {self.name}>"
+
+class PendingEmbedding(Base):
+    __tablename__ = "pending_embeddings"
+    
+    # Notes whose vector is missing from the index and must be re-embedded
+    note_id = Column(String, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    enqueued_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    # Failed entries back off so they cannot block the head of the queue
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_pending_embeddings_next_attempt_at", "next_attempt_at"),
+    )
+    
+    def __repr__(self):
+        return f"<PendingEmbedding {self.note_id}>"
+
+class SyncCheckpoint(Base):
+    __tablename__ = "sync_checkpoints"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+    
+    def __repr__(self):
+        return f"<SyncCheckpoint {self.name}>"
@@ -40,6 +40,11 @@ class NoteResponse(NoteBase):
     class Config:
         orm_mode = True
 
+class NoteChanges(BaseModel):
+    notes: List[NoteResponse]
+    deleted: List[str]
+    cursor: int
+
 # User schemas
 class UserBase(BaseModel):
     email: str
@@ -72,3 +77,8 @@ class TokenData(BaseModel):
 class SearchRequest(BaseModel):
     query: str
     limit: int = 10
+    # Filters are applied inside the vector index, so limit is exact for the filtered set
+    tags: Optional[List[str]] = None  # match notes having any of these tags
+    type: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
@@ -0,0 +1,2 @@
+
+# This file makes the tests directory a Python package
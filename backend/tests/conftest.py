@@ -0,0 +1,120 @@
+
+import os
+import sys
+import tempfile
+
+# Import the backend as a package, the way uvicorn loads it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# database.py builds its engine at import time, so point it at a scratch
+# database before any backend module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import models
+from backend.database import engine
+from backend.api import auth_routes, health_routes, note_routes, search_routes, tag_routes
+from backend.utils import reconcile_utils
+
+def _matches(metadata: dict, conditions: dict) -> bool:
+    for key, condition in conditions.items():
+        value = metadata.get(key)
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$in" and not (set(value) if isinstance(value, list) else {value}) & set(expected):
+                return False
+            if op == "$gte" and (value is None or value < expected):
+                return False
+            if op == "$lte" and (value is None or value > expected):
+                return False
+    return True
+
+class FakeIndex:
+    """In-memory stand-in for a pinecone-client 2.x index"""
+
+    def __init__(self):
+        self.vectors = {}
+        self.fail = False
+        self.calls = []
+
+    def _call(self, name):
+        self.calls.append(name)
+        if self.fail:
+            raise RuntimeError("index unavailable")
+
+    def upsert(self, vectors):
+        self._call("upsert")
+        for vector_id, embedding, metadata in vectors:
+            self.vectors[vector_id] = dict(metadata)
+
+    def update(self, id, set_metadata=None):
+        self._call("update")
+        self.vectors[id].update(set_metadata or {})
+
+    def delete(self, ids):
+        self._call("delete")
+        for vector_id in ids:
+            self.vectors.pop(vector_id, None)
+
+    def fetch(self, ids):
+        self._call("fetch")
+        return SimpleNamespace(vectors={i: self.vectors[i] for i in ids if i in self.vectors})
+
+    def describe_index_stats(self):
+        self._call("describe_index_stats")
+        return {"dimension": 3, "total_vector_count": len(self.vectors)}
+
+    def query(self, vector, top_k, include_metadata=False, filter=None):
+        self._call("query")
+        matches = [
+            SimpleNamespace(id=vector_id, score=1.0, metadata=metadata)
+            for vector_id, metadata in sorted(self.vectors.items())
+            if _matches(metadata, filter or {})
+        ]
+        return SimpleNamespace(matches=matches[:top_k])
+
+def fake_embedding(text):
+    return [0.0, 0.0, 0.0]
+
+@pytest.fixture
+def fake_index(monkeypatch):
+    index = FakeIndex()
+    for module in (note_routes, search_routes):
+        monkeypatch.setattr(module, "index", index)
+    for module in (note_routes, search_routes, reconcile_utils):
+        monkeypatch.setattr(module, "get_embedding", fake_embedding)
+    return index
+
+@pytest.fixture
+def db_engine():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    return engine
+
+@pytest.fixture
+def client(db_engine, fake_index):
+    # Mirrors main.py without the Pinecone and OpenAI start-up calls
+    app = FastAPI()
+    for router in (auth_routes.router, health_routes.router, note_routes.router, search_routes.router, tag_routes.router):
+        app.include_router(router)
+    return TestClient(app)
+
+@pytest.fixture
+def auth_headers(client):
+    client.post("/register", json={"email": "ada@example.com", "username": "ada", "password": "secret"})
+    token = client.post("/token", data={"username": "ada@example.com", "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def create_note(client, headers, title="note", tags=(), note_type="note", store_vector=True):
+    response = client.post("/notes", headers=headers, json={
+        "title": title, "content": "content", "type": note_type,
+        "tags": list(tags), "storeVector": store_vector
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
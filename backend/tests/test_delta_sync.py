@@ -0,0 +1,52 @@
+
+from datetime import datetime
+
+from sqlalchemy import text
+
+from .conftest import create_note
+
+def sync(client, headers, since=None):
+    params = {} if since is None else {"since": since}
+    response = client.get("/notes/changes", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_full_sync_then_incremental(client, auth_headers):
+    first = create_note(client, auth_headers, title="first")
+    second = create_note(client, auth_headers, title="second")
+
+    full = sync(client, auth_headers)
+    assert {note["id"] for note in full["notes"]} == {first["id"], second["id"]}
+    assert full["deleted"] == []
+
+    assert sync(client, auth_headers, full["cursor"]) == {"notes": [], "deleted": [], "cursor": full["cursor"]}
+
+    client.put(f"/notes/{first['id']}", headers=auth_headers, json={"tags": ["retagged"]})
+    client.delete(f"/notes/{second['id']}", headers=auth_headers)
+
+    changes = sync(client, auth_headers, full["cursor"])
+    assert [note["title"] for note in changes["notes"]] == ["first"]
+    assert changes["notes"][0]["tags"][0]["name"] == "retagged"
+    assert changes["deleted"] == [second["id"]]
+    assert changes["cursor"] > full["cursor"]
+
+def test_cursor_ignores_wall_clock(client, auth_headers, db_engine):
+    note = create_note(client, auth_headers)
+    cursor = sync(client, auth_headers)["cursor"]
+
+    client.put(f"/notes/{note['id']}", headers=auth_headers, json={"title": "late"})
+    # Stamp the write earlier than anything synced, as a lagging clock would
+    with db_engine.begin() as conn:
+        conn.execute(text("UPDATE notes SET updated_at = :old WHERE id = :id"),
+                     {"old": datetime(2000, 1, 1), "id": note["id"]})
+
+    changes = sync(client, auth_headers, cursor)
+    assert [n["title"] for n in changes["notes"]] == ["late"]
+
+def test_changes_are_per_user(client, auth_headers):
+    create_note(client, auth_headers)
+    client.post("/register", json={"email": "bob@example.com", "username": "bob", "password": "secret"})
+    token = client.post("/token", data={"username": "bob@example.com", "password": "secret"}).json()["access_token"]
+
+    other = sync(client, {"Authorization": f"Bearer {token}"})
+    assert other["notes"] == []
@@ -0,0 +1,57 @@
+
+from sqlalchemy import text
+
+from backend.api import note_routes
+from .conftest import create_note
+
+def test_notes_etag_short_circuits_until_a_write(client, auth_headers):
+    create_note(client, auth_headers)
+    first = client.get("/notes", headers=auth_headers)
+    etag = first.headers["ETag"]
+
+    cached = client.get("/notes", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    create_note(client, auth_headers, title="second")
+    fresh = client.get("/notes", headers={**auth_headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert len(fresh.json()) == 2
+
+def test_tags_etag(client, auth_headers):
+    create_note(client, auth_headers, tags=["ideas"])
+    etag = client.get("/tags", headers=auth_headers).headers["ETag"]
+    assert client.get("/tags", headers={**auth_headers, "If-None-Match": f"W/{etag}"}).status_code == 304
+
+def test_put_with_stale_if_match_is_rejected(client, auth_headers, fake_index):
+    note = create_note(client, auth_headers)
+    etag = client.get(f"/notes/{note['id']}", headers=auth_headers).headers["ETag"]
+
+    updated = client.put(f"/notes/{note['id']}", headers={**auth_headers, "If-Match": etag}, json={"title": "first"})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+
+    stale = client.put(f"/notes/{note['id']}", headers={**auth_headers, "If-Match": etag}, json={"title": "second"})
+    assert stale.status_code == 412
+    assert client.get(f"/notes/{note['id']}", headers=auth_headers).json()["title"] == "first"
+    assert fake_index.vectors[note["vectorId"]]["title"] == "first"
+
+def test_losing_concurrent_update_never_reaches_the_index(client, auth_headers, fake_index, db_engine, monkeypatch):
+    note = create_note(client, auth_headers, tags=["ideas"])
+    original_get_or_create_tags = note_routes.get_or_create_tags
+
+    def get_or_create_tags_then_race(db, tag_names):
+        tags = original_get_or_create_tags(db, tag_names)
+        # Another writer commits between our read and our guarded update
+        with db_engine.begin() as conn:
+            conn.execute(text("UPDATE notes SET version = version + 1 WHERE id = :id"), {"id": note["id"]})
+        return tags
+
+    monkeypatch.setattr(note_routes, "get_or_create_tags", get_or_create_tags_then_race)
+    fake_index.calls.clear()
+    response = client.put(f"/notes/{note['id']}", headers=auth_headers, json={"title": "loser", "tags": ["ideas"]})
+
+    assert response.status_code == 412
+    assert "upsert" not in fake_index.calls
+    assert fake_index.vectors[note["vectorId"]]["title"] == "note"
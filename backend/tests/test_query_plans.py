@@ -0,0 +1,117 @@
+
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, make_url, select, text
+
+from backend import models
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Revision holding the schema create_all built before migrations existed
+BASELINE_REVISION = "0b7e4f1c9a35"
+
+# Postgres plans are only checked against a database supplied for the run;
+# the test works in its own schema and drops it afterwards
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+POSTGRES_SCHEMA = "query_plans"
+
+TAGS = 30
+
+# The queries behind the notes listing, tags, delta sync, search and the
+# reconciler's orphan lookup
+PLANNED_QUERIES = {
+    "notes listing": select(models.Note).where(models.Note.owner_id == "user-1").order_by(
+        models.Note.created_at.desc(), models.Note.id.desc()
+    ),
+    "tags join": select(models.Tag).join(models.Tag.notes).where(
+        models.Note.owner_id == "user-1"
+    ).distinct(),
+    "delta sync": select(models.Note).where(
+        models.Note.owner_id == "user-1",
+        models.Note.change_seq > 10
+    ).order_by(models.Note.change_seq),
+    "search lookup": select(models.Note).where(
+        models.Note.id.in_([f"note-1-{n}" for n in range(5)]),
+        models.Note.owner_id == "user-1"
+    ),
+    "orphan lookup": select(models.Note.id).where(models.Note.id.in_([f"note-1-{n}" for n in range(5)])),
+}
+
+def migrate_and_seed(url: str, users: int, notes_per_user: int):
+    """Seed a database at the baseline revision, then run alembic upgrade head on it.
+
+    Alembic's env.py reads DATABASE_URL, so callers point it at url first.
+    """
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, BASELINE_REVISION)
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO tags (id, name) VALUES (:id, :name)"),
+                     [{"id": f"tag-{t}", "name": f"tag {t}"} for t in range(TAGS)])
+        for u in range(users):
+            conn.execute(text("INSERT INTO users (id, email, username, is_active) VALUES (:id, :id, :id, :active)"),
+                         {"id": f"user-{u}", "active": True})
+            notes = [{"id": f"note-{u}-{n}", "owner_id": f"user-{u}"} for n in range(notes_per_user)]
+            conn.execute(text("INSERT INTO notes (id, title, owner_id) VALUES (:id, :id, :owner_id)"), notes)
+            conn.execute(text("INSERT INTO note_tags (note_id, tag_id) VALUES (:note_id, :tag_id)"),
+                         [{"note_id": note["id"], "tag_id": f"tag-{n % TAGS}"} for n, note in enumerate(notes)])
+    command.upgrade(config, "head")
+
+    # Give the planner real statistics, as a long-running database would have
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return engine
+
+@pytest.fixture
+def migrated_engine(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'plans.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    engine = migrate_and_seed(url, users=50, notes_per_user=20)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def postgres_engine(monkeypatch):
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    admin = create_engine(TEST_POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {POSTGRES_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {POSTGRES_SCHEMA}"))
+    url = make_url(TEST_POSTGRES_URL).update_query_dict(
+        {"options": f"-csearch_path={POSTGRES_SCHEMA}"}
+    ).render_as_string(hide_password=False)
+    monkeypatch.setenv("DATABASE_URL", url)
+    # Big enough that the planner never prefers a sequential scan on cost alone
+    engine = migrate_and_seed(url, users=200, notes_per_user=50)
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {POSTGRES_SCHEMA} CASCADE"))
+    admin.dispose()
+
+def explain(engine, statement, prefix: str) -> list:
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"{prefix} {compiled.string}", params).all()
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize("name", PLANNED_QUERIES)
+def test_sqlite_plans_avoid_table_scans(migrated_engine, name):
+    plan = explain(migrated_engine, PLANNED_QUERIES[name], "EXPLAIN QUERY PLAN")
+    scans = [step for step in plan if step.startswith(("SCAN notes", "SCAN note_tags"))]
+    assert not scans, f"table scan in {name} plan: {plan}"
+
+@pytest.mark.parametrize("name", PLANNED_QUERIES)
+def test_postgres_plans_avoid_seq_scans(postgres_engine, name):
+    plan = explain(postgres_engine, PLANNED_QUERIES[name], "EXPLAIN")
+    scans = [step for step in plan if "Seq Scan on notes" in step or "Seq Scan on note_tags" in step]
+    assert not scans, f"sequential scan in {name} plan: {plan}"
@@ -0,0 +1,57 @@
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import database
+from .conftest import create_note
+
+def checkouts(name):
+    return database.pool_metrics[name]["checkouts"]
+
+def test_read_route_uses_one_connection(client, auth_headers):
+    create_note(client, auth_headers)
+    before = checkouts("primary")
+    assert client.get("/notes", headers=auth_headers).status_code == 200
+    assert checkouts("primary") - before == 1
+
+def test_read_routes_leave_the_primary_alone_with_a_replica(client, auth_headers, monkeypatch):
+    create_note(client, auth_headers)
+    replica = create_engine(database.DATABASE_URL, connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "read_engine", replica)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica))
+
+    primary_before, replica_before = checkouts("primary"), checkouts("replica")
+    for path in ("/notes", "/tags", "/notes/changes"):
+        assert client.get(path, headers=auth_headers).status_code == 200
+    assert checkouts("primary") == primary_before
+    assert checkouts("replica") - replica_before == 3
+    replica.dispose()
+
+def test_single_note_reads_use_the_primary(client, auth_headers, monkeypatch):
+    note = create_note(client, auth_headers)
+    replica = create_engine(database.DATABASE_URL, connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "read_engine", replica)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica))
+
+    replica_before = checkouts("replica")
+    assert client.get(f"/notes/{note['id']}", headers=auth_headers).status_code == 200
+    assert checkouts("replica") == replica_before
+    replica.dispose()
+
+def test_pool_stats_use_the_configured_capacity(db_engine):
+    threads = [threading.Thread(target=lambda: next(database.get_db()).close()) for _ in range(20)]
+    before = checkouts("primary")
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = database.get_pool_stats()["primary"]
+    assert stats["checkouts"] - before == 20
+    assert stats["capacity"] == database.DB_POOL_SIZE + database.DB_MAX_OVERFLOW
+
+def test_pool_stats_require_authentication(client, auth_headers):
+    assert client.get("/health/db").status_code == 401
+    response = client.get("/health/db", headers=auth_headers)
+    assert response.status_code == 200
+    assert "primary" in response.json()
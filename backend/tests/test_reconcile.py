@@ -0,0 +1,152 @@
+
+from backend import models
+from backend.database import SessionLocal
+from backend.utils import reconcile_utils
+from backend.utils.reconcile_utils import reconcile_vectors
+from .conftest import create_note
+
+def run_reconciler(index, **kwargs):
+    db = SessionLocal()
+    try:
+        return reconcile_vectors(db, index, **kwargs)
+    finally:
+        db.close()
+
+def test_failed_upsert_keeps_tagged_note_and_queues_it(client, auth_headers, fake_index):
+    fake_index.fail = True
+    note = create_note(client, auth_headers, title="tagged", tags=["work", "ideas"])
+    fake_index.fail = False
+
+    assert client.get(f"/notes/{note['id']}", headers=auth_headers).status_code == 200
+    db = SessionLocal()
+    try:
+        assert db.query(models.PendingEmbedding).filter(models.PendingEmbedding.note_id == note["id"]).count() == 1
+    finally:
+        db.close()
+
+    report = run_reconciler(fake_index)
+    assert report["reembedded"] == 1
+    assert report["pending_embeddings"] == 0
+    assert sorted(fake_index.vectors[f"note:{note['id']}"]["tags"]) == ["ideas", "work"]
+
+def test_vector_is_written_only_after_the_note_is_saved(client, auth_headers, fake_index, monkeypatch):
+    saved_at_upsert = []
+    original_upsert = fake_index.upsert
+
+    def upsert(vectors):
+        db = SessionLocal()
+        try:
+            saved_at_upsert.extend(
+                db.query(models.Note).filter(models.Note.id == metadata["id"]).count() == 1
+                for _, _, metadata in vectors
+            )
+        finally:
+            db.close()
+        original_upsert(vectors)
+
+    monkeypatch.setattr(fake_index, "upsert", upsert)
+    create_note(client, auth_headers, tags=["work"])
+    assert saved_at_upsert == [True]
+
+def test_tombstone_sweep_does_not_skip_equal_timestamps(db_engine, fake_index):
+    deleted_at = models.utcnow()
+    db = SessionLocal()
+    try:
+        db.add(models.User(id="owner", email="owner@example.com", username="owner"))
+        db.flush()
+        for i in range(5):
+            db.add(models.NoteTombstone(note_id=f"gone-{i}", owner_id="owner", deleted_at=deleted_at))
+            fake_index.vectors[f"note:gone-{i}"] = {"id": f"gone-{i}"}
+        db.commit()
+    finally:
+        db.close()
+
+    # One tombstone per batch puts every boundary on the shared timestamp
+    for _ in range(5):
+        run_reconciler(fake_index, batch_size=1, max_batches=1)
+    assert fake_index.vectors == {}
+
+def test_failing_embeddings_back_off_instead_of_blocking_the_queue(client, auth_headers, fake_index, monkeypatch):
+    fake_index.fail = True
+    broken = create_note(client, auth_headers, title="broken")
+    healthy = create_note(client, auth_headers, title="healthy")
+    fake_index.fail = False
+
+    def get_embedding(text):
+        if text.startswith("broken"):
+            raise RuntimeError("embedding failed")
+        return [0.0, 0.0, 0.0]
+
+    monkeypatch.setattr(reconcile_utils, "get_embedding", get_embedding)
+    first = run_reconciler(fake_index, batch_size=1)
+    second = run_reconciler(fake_index, batch_size=1)
+
+    assert first["reembed_failures"] + second["reembed_failures"] == 1
+    assert f"note:{healthy['id']}" in fake_index.vectors
+    assert f"note:{broken['id']}" not in fake_index.vectors
+    db = SessionLocal()
+    try:
+        entry = db.query(models.PendingEmbedding).one()
+        assert entry.note_id == broken["id"]
+        assert entry.attempts == 1
+    finally:
+        db.close()
+
+def test_orphans_are_found_without_id_listing(client, auth_headers, fake_index):
+    note = create_note(client, auth_headers)
+    user_id = fake_index.vectors[note["vectorId"]]["user_id"]
+    # Left behind by a failed delete from before tombstones existed
+    fake_index.vectors["note:orphan"] = {"id": "orphan", "user_id": user_id}
+    assert not hasattr(fake_index, "list_paginated")
+
+    report = run_reconciler(fake_index)
+    assert report["orphan_vectors"] == 1
+    assert set(fake_index.vectors) == {note["vectorId"]}
+
+def test_orphan_deletes_are_chunked_by_batch_size(client, auth_headers, fake_index, monkeypatch):
+    note = create_note(client, auth_headers)
+    user_id = fake_index.vectors[note["vectorId"]]["user_id"]
+    for n in range(5):
+        fake_index.vectors[f"note:orphan-{n}"] = {"id": f"orphan-{n}", "user_id": user_id}
+    deleted = []
+    delete = fake_index.delete
+    monkeypatch.setattr(fake_index, "delete", lambda ids: deleted.append(list(ids)) or delete(ids))
+
+    report = run_reconciler(fake_index, batch_size=2)
+    assert report["orphan_vectors"] == 5
+    assert set(fake_index.vectors) == {note["vectorId"]}
+    assert deleted and max(len(ids) for ids in deleted) <= 2
+
+def test_reembedding_skips_notes_edited_since_they_were_read(client, auth_headers, fake_index, monkeypatch):
+    fake_index.fail = True
+    note = create_note(client, auth_headers, title="queued")
+    fake_index.fail = False
+
+    def get_embedding(text):
+        # An edit lands between the reconciler reading the note and writing it
+        db = SessionLocal()
+        try:
+            db.query(models.Note).filter(models.Note.id == note["id"]).update(
+                {models.Note.version: models.Note.version + 1}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        return [0.0, 0.0, 0.0]
+
+    monkeypatch.setattr(reconcile_utils, "get_embedding", get_embedding)
+    report = run_reconciler(fake_index)
+    assert report["reembed_conflicts"] == 1
+    assert f"note:{note['id']}" not in fake_index.vectors
+
+    db = SessionLocal()
+    try:
+        assert db.query(models.PendingEmbedding).filter(models.PendingEmbedding.note_id == note["id"]).count() == 1
+        assert db.query(models.Note).filter(models.Note.id == note["id"]).one().version == 2
+    finally:
+        db.close()
+
+    monkeypatch.setattr(reconcile_utils, "get_embedding", lambda text: [0.0, 0.0, 0.0])
+    report = run_reconciler(fake_index)
+    assert report["reembedded"] == 1
+    assert f"note:{note['id']}" in fake_index.vectors
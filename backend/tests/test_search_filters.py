@@ -0,0 +1,43 @@
+
+from backend.utils.reconcile_utils import reconcile_vectors
+from backend.database import SessionLocal
+from .conftest import create_note
+
+def search(client, headers, **filters):
+    response = client.post("/search", headers=headers, json={"query": "anything", **filters})
+    assert response.status_code == 200, response.text
+    return [note["title"] for note in response.json()]
+
+def test_filters_are_pushed_into_the_index(client, auth_headers, fake_index):
+    create_note(client, auth_headers, title="idea", tags=["work"], note_type="note")
+    create_note(client, auth_headers, title="bookmark", tags=["home"], note_type="link")
+
+    assert search(client, auth_headers, tags=["work"]) == ["idea"]
+    assert search(client, auth_headers, type="link") == ["bookmark"]
+    assert search(client, auth_headers, created_after="2000-01-01T00:00:00Z", limit=1) != []
+    assert search(client, auth_headers, created_before="2000-01-01T00:00:00Z") == []
+
+def test_limit_is_exact_for_the_filtered_set(client, auth_headers):
+    for i in range(3):
+        create_note(client, auth_headers, title=f"other {i}", tags=["home"])
+    create_note(client, auth_headers, title="wanted", tags=["work"])
+
+    assert search(client, auth_headers, tags=["work"], limit=1) == ["wanted"]
+
+def test_backfill_makes_legacy_vectors_filterable(client, auth_headers, fake_index):
+    note = create_note(client, auth_headers, title="legacy", tags=["work"])
+    # Metadata as written before tags and created_at were stored
+    fake_index.vectors[note["vectorId"]] = {
+        "id": note["id"], "title": "legacy", "type": "note", "user_id": fake_index.vectors[note["vectorId"]]["user_id"]
+    }
+    assert search(client, auth_headers, tags=["work"]) == []
+
+    db = SessionLocal()
+    try:
+        assert reconcile_vectors(db, fake_index)["metadata_backfilled"] == 1
+        # The backfill runs once
+        assert reconcile_vectors(db, fake_index)["metadata_backfilled"] == 0
+    finally:
+        db.close()
+
+    assert search(client, auth_headers, tags=["work"]) == ["legacy"]
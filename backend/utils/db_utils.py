@@ -14,3 +14,24 @@ def get_or_create_tags(db: Session, tag_names: List[str]):
             db.flush()
         tags.append(tag)
     return tags
+
+def get_change_version(db: Session, user_id: str) -> int:
+    """Get the user's current change version without loading any notes"""
+    version = db.query(models.User.change_version).filter(models.User.id == user_id).scalar()
+    return version or 0
+
+def bump_change_version(db: Session, user_id: str) -> int:
+    """Increment the user's change version and return it; call on every note or tag write.
+
+    The UPDATE locks the user row until commit, so a user's writes get
+    versions in commit order and the version is safe to use as a sync cursor.
+    """
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.change_version: models.User.change_version + 1},
+        synchronize_session=False
+    )
+    return get_change_version(db, user_id)
+
+def enqueue_embedding(db: Session, note_id: str):
+    """Queue a note for re-embedding by the vector reconciler"""
+    db.merge(models.PendingEmbedding(note_id=note_id))
@@ -0,0 +1,24 @@
+
+from typing import Optional
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the given parts"""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def note_etag(note) -> str:
+    """Strong ETag for a single note, derived from its id and version"""
+    return make_etag("note", note.id, note.version)
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = False) -> bool:
+    """Check an If-None-Match (weak) or If-Match (strong) header against an ETag"""
+    if not header:
+        return False
+    for value in header.split(","):
+        value = value.strip()
+        if value == "*":
+            return True
+        if weak and value.startswith("W/"):
+            value = value[2:]
+        if value == etag:
+            return True
+    return False
@@ -0,0 +1,286 @@
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from .. import models
+from .db_utils import bump_change_version
+from .vector_utils import get_embedding, get_combined_text, build_vector_metadata
+
+VECTOR_PREFIX = "note:"
+NOTES_CHECKPOINT = "reconcile:notes"
+INDEX_CHECKPOINT = "reconcile:index"
+TOMBSTONES_CHECKPOINT = "reconcile:tombstones"
+USERS_CHECKPOINT = "reconcile:users"
+# Pinecone's top_k ceiling; a user's vectors are listed exhaustively below it
+QUERY_LIST_LIMIT = 10000
+BACKFILL_CHECKPOINT = "backfill:metadata"
+BACKFILL_DONE = "done"
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 86400
+
+def get_checkpoint(db: Session, name: str) -> Optional[str]:
+    """Get a stored reconciler checkpoint"""
+    checkpoint = db.query(models.SyncCheckpoint).filter(models.SyncCheckpoint.name == name).first()
+    return checkpoint.value if checkpoint else None
+
+def set_checkpoint(db: Session, name: str, value: Optional[str]):
+    """Store a reconciler checkpoint and commit the work done so far"""
+    db.merge(models.SyncCheckpoint(name=name, value=value))
+    db.commit()
+
+def iter_note_batches(db: Session, batch_size: int, after_id: Optional[str] = None) -> Iterator[List[Tuple[str, str]]]:
+    """Stream (note id, vector id) pairs in primary-key keyset batches"""
+    while True:
+        query = db.query(models.Note.id, models.Note.vector_id).filter(models.Note.vector_id.isnot(None))
+        if after_id:
+            query = query.filter(models.Note.id > after_id)
+        batch = query.order_by(models.Note.id).limit(batch_size).all()
+        if not batch:
+            return
+        yield [(note_id, vector_id) for note_id, vector_id in batch]
+        after_id = batch[-1][0]
+
+def iter_index_pages(index, batch_size: int, token: Optional[str] = None) -> Iterator[Tuple[List[str], Optional[str]]]:
+    """Stream note vector ids from the index with the pagination token to resume after each page"""
+    while True:
+        page = index.list_paginated(prefix=VECTOR_PREFIX, limit=batch_size, pagination_token=token)
+        ids = [vector.id for vector in page.vectors]
+        token = page.pagination.next if page.pagination else None
+        yield ids, token
+        if not token:
+            return
+
+def _check_missing_vectors(db: Session, index, batch_size: int, max_batches: Optional[int], metrics: dict):
+    """Queue notes whose recorded vector is not in the index"""
+    batches = iter_note_batches(db, batch_size, get_checkpoint(db, NOTES_CHECKPOINT))
+    for count, batch in enumerate(batches, start=1):
+        present = index.fetch(ids=[vector_id for _, vector_id in batch]).vectors
+        missing = [note_id for note_id, vector_id in batch if vector_id not in present]
+        for note_id in missing:
+            db.merge(models.PendingEmbedding(note_id=note_id))
+        metrics["notes_scanned"] += len(batch)
+        metrics["missing_vectors"] += len(missing)
+        set_checkpoint(db, NOTES_CHECKPOINT, batch[-1][0])
+        if max_batches and count >= max_batches:
+            return
+    # Full pass complete; start over on the next run
+    set_checkpoint(db, NOTES_CHECKPOINT, None)
+
+def _find_orphans(db: Session, vector_ids: List[str]) -> List[str]:
+    """Vector ids whose note no longer exists.
+
+    Vector ids are derived from note ids, so the lookup goes through the
+    notes primary key rather than the unindexed vector_id column.
+    """
+    note_ids = [vector_id[len(VECTOR_PREFIX):] for vector_id in vector_ids if vector_id.startswith(VECTOR_PREFIX)]
+    known = {
+        note_id for (note_id,) in
+        db.query(models.Note.id).filter(models.Note.id.in_(note_ids)).all()
+    } if note_ids else set()
+    return [
+        vector_id for vector_id in vector_ids
+        if not vector_id.startswith(VECTOR_PREFIX) or vector_id[len(VECTOR_PREFIX):] not in known
+    ]
+
+def _delete_orphan_vectors(db: Session, index, batch_size: int, max_batches: Optional[int], metrics: dict):
+    """Delete index entries that no note refers to"""
+    pages = iter_index_pages(index, batch_size, get_checkpoint(db, INDEX_CHECKPOINT))
+    for count, (ids, token) in enumerate(pages, start=1):
+        orphans = _find_orphans(db, ids)
+        if orphans:
+            index.delete(ids=orphans)
+        metrics["vectors_scanned"] += len(ids)
+        metrics["orphan_vectors"] += len(orphans)
+        set_checkpoint(db, INDEX_CHECKPOINT, token)
+        if max_batches and count >= max_batches:
+            return
+
+def _delete_orphan_vectors_by_user(db: Session, index, batch_size: int, max_batches: Optional[int], metrics: dict):
+    """Delete orphan vectors for indexes that cannot list their ids.
+
+    A metadata-filtered query with a top_k above the user's vector count
+    returns every vector of that user, which serves as the id listing.
+    """
+    dimension = index.describe_index_stats()["dimension"]
+    probe = [1.0] * dimension
+    after_id = get_checkpoint(db, USERS_CHECKPOINT)
+    count = 0
+    while not max_batches or count < max_batches:
+        query = db.query(models.User.id)
+        if after_id:
+            query = query.filter(models.User.id > after_id)
+        user_ids = [user_id for (user_id,) in query.order_by(models.User.id).limit(batch_size).all()]
+        if not user_ids:
+            set_checkpoint(db, USERS_CHECKPOINT, None)
+            return
+        for user_id in user_ids:
+            matches = index.query(vector=probe, top_k=QUERY_LIST_LIMIT, filter={"user_id": {"$eq": user_id}}).matches
+            ids = [match.id for match in matches]
+            if len(ids) >= QUERY_LIST_LIMIT:
+                print(f"User {user_id} has over {QUERY_LIST_LIMIT} vectors; orphan check is partial")
+            orphans = _find_orphans(db, ids)
+            # A user's listing can run to QUERY_LIST_LIMIT ids; keep each delete request bounded
+            for start in range(0, len(orphans), batch_size):
+                index.delete(ids=orphans[start:start + batch_size])
+            metrics["vectors_scanned"] += len(ids)
+            metrics["orphan_vectors"] += len(orphans)
+        after_id = user_ids[-1]
+        set_checkpoint(db, USERS_CHECKPOINT, after_id)
+        count += 1
+
+def _sweep_tombstones(db: Session, index, batch_size: int, max_batches: Optional[int], metrics: dict):
+    """Delete vectors of deleted notes, for indexes that cannot list their ids.
+
+    Catches orphans the per-user listing cannot reach, such as vectors of
+    users with more than QUERY_LIST_LIMIT vectors.
+    """
+    # Keyset on (deleted_at, note_id) so tombstones sharing a timestamp
+    # across a batch boundary are not skipped
+    checkpoint = get_checkpoint(db, TOMBSTONES_CHECKPOINT)
+    since, after_id = None, None
+    if checkpoint:
+        deleted_at, after_id = checkpoint.split("|", 1)
+        since = datetime.fromisoformat(deleted_at)
+    count = 0
+    while not max_batches or count < max_batches:
+        query = db.query(models.NoteTombstone)
+        if since is not None:
+            query = query.filter(or_(
+                models.NoteTombstone.deleted_at > since,
+                and_(models.NoteTombstone.deleted_at == since, models.NoteTombstone.note_id > after_id)
+            ))
+        batch = query.order_by(models.NoteTombstone.deleted_at, models.NoteTombstone.note_id).limit(batch_size).all()
+        if not batch:
+            return
+        # Deleting ids that are already gone is a no-op for the index
+        index.delete(ids=[f"{VECTOR_PREFIX}{tombstone.note_id}" for tombstone in batch])
+        metrics["tombstones_swept"] += len(batch)
+        since, after_id = batch[-1].deleted_at, batch[-1].note_id
+        set_checkpoint(db, TOMBSTONES_CHECKPOINT, f"{since.isoformat()}|{after_id}")
+        count += 1
+
+def _backfill_metadata(db: Session, index, batch_size: int, max_batches: Optional[int], metrics: dict):
+    """Rewrite metadata of vectors stored before tags and created_at were indexed.
+
+    Search filters on those fields would otherwise skip the older vectors.
+    Runs once, resuming from its checkpoint until every note has been visited.
+    """
+    checkpoint = get_checkpoint(db, BACKFILL_CHECKPOINT)
+    if checkpoint == BACKFILL_DONE:
+        return
+    for count, batch in enumerate(iter_note_batches(db, batch_size, checkpoint), start=1):
+        notes = db.query(models.Note).filter(models.Note.id.in_([note_id for note_id, _ in batch])).all()
+        for note in notes:
+            try:
+                index.update(
+                    id=note.vector_id,
+                    set_metadata=build_vector_metadata(note, [tag.name for tag in note.tags], note.owner_id)
+                )
+                metrics["metadata_backfilled"] += 1
+            except Exception as e:
+                print(f"Error backfilling metadata for note {note.id}: {str(e)}")
+                db.merge(models.PendingEmbedding(note_id=note.id))
+        set_checkpoint(db, BACKFILL_CHECKPOINT, batch[-1][0])
+        if max_batches and count >= max_batches:
+            return
+    set_checkpoint(db, BACKFILL_CHECKPOINT, BACKFILL_DONE)
+
+def _retry_later(db: Session, entry: models.PendingEmbedding, now: datetime):
+    """Push a failed queue entry back with exponential backoff"""
+    entry.attempts += 1
+    entry.next_attempt_at = now + timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** entry.attempts, RETRY_MAX_SECONDS))
+    db.commit()
+
+def process_pending_embeddings(db: Session, index, batch_size: int = 100) -> dict:
+    """Re-embed and upsert queued notes that are due; failures back off exponentially"""
+    results = {"reembedded": 0, "reembed_failures": 0, "reembed_conflicts": 0}
+    now = models.utcnow()
+    pending = db.query(models.PendingEmbedding).filter(
+        models.PendingEmbedding.next_attempt_at <= now
+    ).order_by(models.PendingEmbedding.next_attempt_at).limit(batch_size).all()
+    for entry in pending:
+        note = db.query(models.Note).filter(models.Note.id == entry.note_id).first()
+        if note:
+            note_id, version = note.id, note.version
+            tag_names = [tag.name for tag in note.tags]
+            vector_id = f"{VECTOR_PREFIX}{note.id}"
+            try:
+                embedding = get_embedding(get_combined_text(note, tag_names))
+                metadata = build_vector_metadata(note, tag_names, note.owner_id)
+            except Exception as e:
+                print(f"Error re-embedding note {note_id}: {str(e)}")
+                db.rollback()
+                _retry_later(db, entry, now)
+                results["reembed_failures"] += 1
+                continue
+
+            # Guard against an edit since the note was read, before the index is
+            # touched. The entry stays queued and the next run embeds the new content
+            bumped = db.query(models.Note).filter(
+                models.Note.id == note_id,
+                models.Note.version == version
+            ).update({models.Note.version: models.Note.version + 1}, synchronize_session=False)
+            if not bumped:
+                db.rollback()
+                results["reembed_conflicts"] += 1
+                continue
+            note.vector_id = vector_id
+            note.change_seq = bump_change_version(db, note.owner_id)
+            db.flush()
+
+            try:
+                index.upsert(vectors=[(vector_id, embedding, metadata)])
+            except Exception as e:
+                print(f"Error re-embedding note {note_id}: {str(e)}")
+                db.rollback()
+                _retry_later(db, entry, now)
+                results["reembed_failures"] += 1
+                continue
+            results["reembedded"] += 1
+        db.delete(entry)
+        db.commit()
+    return results
+
+def reconcile_vectors(db: Session, index, batch_size: int = 100, max_batches: Optional[int] = None) -> dict:
+    """Compare notes with the vector index, clean up orphans and queue missing vectors.
+
+    Each phase resumes from its checkpoint, so max_batches bounds the work of
+    a single run and repeated runs walk the whole vault incrementally.
+    """
+    metrics = {
+        "notes_scanned": 0,
+        "missing_vectors": 0,
+        "vectors_scanned": 0,
+        "orphan_vectors": 0,
+        "tombstones_swept": 0,
+        "metadata_backfilled": 0,
+    }
+    _backfill_metadata(db, index, batch_size, max_batches, metrics)
+    _check_missing_vectors(db, index, batch_size, max_batches, metrics)
+    if hasattr(index, "list_paginated"):
+        _delete_orphan_vectors(db, index, batch_size, max_batches, metrics)
+    else:
+        _delete_orphan_vectors_by_user(db, index, batch_size, max_batches, metrics)
+        _sweep_tombstones(db, index, batch_size, max_batches, metrics)
+    metrics.update(process_pending_embeddings(db, index, batch_size))
+    metrics["pending_embeddings"] = db.query(models.PendingEmbedding).count()
+    metrics["missing_ratio"] = metrics["missing_vectors"] / metrics["notes_scanned"] if metrics["notes_scanned"] else 0.0
+    metrics["orphan_ratio"] = metrics["orphan_vectors"] / metrics["vectors_scanned"] if metrics["vectors_scanned"] else 0.0
+    return metrics
+
+if __name__ == "__main__":
+    # Run with: python -m backend.utils.reconcile_utils [batch_size] [max_batches]
+    import sys
+    from ..database import SessionLocal
+    from .vector_utils import initialize_vector_db
+
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    max_batches = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    db = SessionLocal()
+    try:
+        report = reconcile_vectors(db, initialize_vector_db(), batch_size, max_batches)
+    finally:
+        db.close()
+    for name, value in report.items():
+        print(f"{name}: {value}")
@@ -2,6 +2,7 @@
 import os
 import openai
 import pinecone
+from datetime import datetime, timezone
 from typing import List
 
 def get_embedding(text: str):
@@ -17,6 +18,40 @@ def get_combined_text(note, tags: List[str]) -> str:
     tag_text = " ".join(tags) if tags else ""
     return f"{note.title} {note.content} {tag_text}"
 
+def to_timestamp(value: datetime) -> float:
+    """Convert a datetime to a UTC epoch timestamp for numeric metadata filters"""
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; they are stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def build_vector_metadata(note, tags: List[str], user_id: str) -> dict:
+    """Build the metadata stored alongside a note's vector"""
+    return {
+        "id": note.id,
+        "title": note.title,
+        "type": note.type,
+        "tags": tags,
+        "created_at": to_timestamp(note.created_at),
+        "user_id": user_id
+    }
+
+def build_search_filter(user_id: str, request) -> dict:
+    """Translate search request constraints into a Pinecone metadata filter"""
+    conditions = {"user_id": {"$eq": user_id}}
+    if request.tags:
+        conditions["tags"] = {"$in": request.tags}
+    if request.type:
+        conditions["type"] = {"$eq": request.type}
+    created_at = {}
+    if request.created_after:
+        created_at["$gte"] = to_timestamp(request.created_after)
+    if request.created_before:
+        created_at["$lte"] = to_timestamp(request.created_before)
+    if created_at:
+        conditions["created_at"] = created_at
+    return conditions
+
 def initialize_vector_db():
     """Initialize Pinecone vector database"""
     pinecone.init(